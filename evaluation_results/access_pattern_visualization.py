@@ -1,51 +1,87 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from plot_utils import save_figure
+from stats_kernels import grouped_stats
 
 # Paths to your CSV files
 frequency_file = 'frequency_metrics.csv'
 sequential_file = 'sequential_metrics.csv'
 range_file = 'range_metrics.csv'
 
-# Read CSV files
-frequency_df = pd.read_csv(frequency_file)
-sequential_df = pd.read_csv(sequential_file)
-range_df = pd.read_csv(range_file)
+# Only the columns used below are parsed, with their types declared up front
+usecols = ['Implementation_DataType', 'Average_Time_ms']
+dtypes = {'Implementation_DataType': 'category', 'Average_Time_ms': 'float32'}
 
-# Function to calculate summary statistics
-def calculate_summary(df, pattern_type):
-    summary = df.groupby('Implementation_DataType')['Average_Time_ms'].agg(['mean', 'min', 'max', 'std'])
-    summary['Pattern_Type'] = pattern_type
-    return summary
+# Function to calculate summary statistics for every access pattern in one grouped pass
+def calculate_summary(df):
+    return grouped_stats(df, ['Pattern_Type', 'Implementation_DataType'], 'Average_Time_ms')
 
-# Calculate summaries for each access pattern
-frequency_summary = calculate_summary(frequency_df, 'Frequency')
-sequential_summary = calculate_summary(sequential_df, 'Sequential')
-range_summary = calculate_summary(range_df, 'Range')
+# Function to save latency plot for each pattern to its own PNG file, drawn from the precomputed mean and std
+def save_pattern_plot(summary, pattern_name):
+    # Runs in a worker process, which needs the non-interactive backend before pyplot is imported
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
-# Combine all summaries
-all_summaries = pd.concat([frequency_summary, sequential_summary, range_summary])
-print("Summary statistics for each access pattern:\n", all_summaries)
-
-# Function to save latency plot for each pattern to its own PNG file
-def save_pattern_plot(df, pattern_name):
     plt.figure(figsize=(12, 6))
-    sns.barplot(x='Implementation_DataType', y='Average_Time_ms', data=df, errorbar='sd')
+    plt.bar(summary.index.astype(str), summary['mean'], yerr=summary['std'], capsize=4)
     plt.title(f'{pattern_name} Access Pattern Latency Comparison')
     plt.xticks(rotation=45, ha='right')
     plt.ylabel('Average Time (ms)')
     plt.xlabel('Implementation and DataType')
     plt.tight_layout()
     file_name = f'{pattern_name.lower()}_access_pattern.png'
-    plt.savefig(file_name)
+    file_name = save_figure(plt.gcf(), file_name)
     plt.close()
-    print(f"{pattern_name} access pattern plot saved as '{file_name}'")
+    return file_name
+
+def analyze_access_patterns(plots=True):
+    # Read CSV files
+    frequency_df = pd.read_csv(frequency_file, usecols=usecols, dtype=dtypes, engine='c')
+    sequential_df = pd.read_csv(sequential_file, usecols=usecols, dtype=dtypes, engine='c')
+    range_df = pd.read_csv(range_file, usecols=usecols, dtype=dtypes, engine='c')
+
+    # Combine the access patterns, keeping the grouping keys categorical so the groupby uses integer codes
+    combined = pd.concat([
+        frequency_df.assign(Pattern_Type='Frequency'),
+        sequential_df.assign(Pattern_Type='Sequential'),
+        range_df.assign(Pattern_Type='Range')
+    ], ignore_index=True)
+    combined['Pattern_Type'] = pd.Categorical(combined['Pattern_Type'], categories=['Frequency', 'Sequential', 'Range'])
+    combined['Implementation_DataType'] = combined['Implementation_DataType'].astype('category')
+
+    all_summaries = calculate_summary(combined)
+    print("Summary statistics for each access pattern:\n", all_summaries)
+
+    # Generate plots for each access pattern; they are independent, so each one is
+    # rasterised and encoded in its own process
+    if plots:
+        # A pattern whose metrics file has no rows has no summary to plot
+        present = set(all_summaries.index.get_level_values('Pattern_Type'))
+        pattern_names = []
+        for pattern_name in ['Frequency', 'Sequential', 'Range']:
+            if pattern_name in present:
+                pattern_names.append(pattern_name)
+            else:
+                print(f"No data recorded for the {pattern_name} access pattern. Skipping its plot.")
+        summaries = [all_summaries.xs(pattern_name, level='Pattern_Type') for pattern_name in pattern_names]
+        if pattern_names:
+            with ProcessPoolExecutor(max_workers=len(pattern_names)) as executor:
+                file_names = executor.map(save_pattern_plot, summaries, pattern_names)
+                for pattern_name, file_name in zip(pattern_names, file_names):
+                    print(f"{pattern_name} access pattern plot saved as '{file_name}'")
+
+    # Export combined summaries to a CSV file in the same folder as the Python script
+    all_summaries.to_csv('access_pattern_summary.csv', index=True)
+    print("Access pattern summary saved as 'access_pattern_summary.csv'")
 
-# Generate plots for each access pattern
-save_pattern_plot(frequency_df, 'Frequency')
-save_pattern_plot(sequential_df, 'Sequential')
-save_pattern_plot(range_df, 'Range')
+def main():
+    parser = argparse.ArgumentParser(description='Summarise the access pattern metrics CSVs')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='only write the summary CSV, without importing matplotlib')
+    args = parser.parse_args()
+    analyze_access_patterns(plots=not args.no_plots)
 
-# Export combined summaries to a CSV file in the same folder as the Python script
-all_summaries.to_csv('access_pattern_summary.csv', index=True)
-print("Access pattern summary saved as 'access_pattern_summary.csv'")
+if __name__ == "__main__":
+    main()
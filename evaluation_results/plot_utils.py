@@ -0,0 +1,52 @@
+import os
+import numpy as np
+
+# Output format for all plots; set PLOT_FORMAT=webp for quicker draft runs
+PLOT_FORMAT = os.environ.get('PLOT_FORMAT', 'png')
+
+_plot_style_applied = False
+
+def get_pyplot(**rc_overrides):
+    # matplotlib is only imported once something is plotted, and styled on the first call;
+    # rc_overrides are rcParams a script sets on top of the shared style
+    global _plot_style_applied
+    # Only image files are produced, so use the non-interactive backend and skip GUI toolkit setup
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    if not _plot_style_applied:
+        # Set style for all plots
+        plt.style.use('seaborn-v0_8')
+        plt.rcParams['figure.figsize'] = [12, 6]
+        plt.rcParams['figure.dpi'] = 100
+        _plot_style_applied = True
+    plt.rcParams.update(rc_overrides)
+    return plt
+
+def save_figure(fig, file_name, **kwargs):
+    # PNG encoding is the slowest part of saving, so use a light zlib level and skip the Software tag
+    if PLOT_FORMAT == 'png':
+        fig.savefig(file_name, dpi=100, pil_kwargs={'compress_level': 1},
+                    metadata={'Software': None}, **kwargs)
+    else:
+        file_name = f'{os.path.splitext(file_name)[0]}.{PLOT_FORMAT}'
+        fig.savefig(file_name, dpi=100, format=PLOT_FORMAT, **kwargs)
+    return file_name
+
+def render_figure(fig):
+    # Rasterise the figure and copy its RGBA pixels, so the figure can be cleared and reused
+    # while the copy is still being encoded
+    fig.canvas.draw()
+    return np.array(fig.canvas.buffer_rgba())
+
+def save_image(rgba, file_name, dpi=100):
+    # Encode pixels from render_figure with the same settings as save_figure; the encoder
+    # releases the GIL, so several images can be written from a thread pool at once
+    from matplotlib.image import imsave
+    if PLOT_FORMAT == 'png':
+        imsave(file_name, rgba, format='png', dpi=dpi, pil_kwargs={'compress_level': 1},
+               metadata={'Software': None})
+    else:
+        file_name = f'{os.path.splitext(file_name)[0]}.{PLOT_FORMAT}'
+        imsave(file_name, rgba, format=PLOT_FORMAT, dpi=dpi)
+    return file_name
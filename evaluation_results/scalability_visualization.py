@@ -1,103 +1,164 @@
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Set style for all plots
-plt.style.use('seaborn-v0_8')
-plt.rcParams['figure.figsize'] = [12, 6]
-plt.rcParams['figure.dpi'] = 100
-
-def analyze_scalability(file_path='scalability_test_results.csv'):
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from plot_utils import get_pyplot, save_figure
+
+# Simplify line paths and render them in chunks for faster line drawing
+PLOT_RC = {'path.simplify': True, 'agg.path.chunksize': 10000}
+
+# Column types of scalability_test_results.csv, enforced by the Arrow parser
+SCALABILITY_TYPES = {
+    'Implementation': pa.dictionary(pa.int32(), pa.string()),
+    'RowCount': pa.int64(),
+    'TotalTime(ms)': pa.float32(),
+    'AvgTimePerOp(ms)': pa.float32(),
+    'MinLatency(ms)': pa.float32(),
+    'MaxLatency(ms)': pa.float32(),
+    '50thPercentile(ms)': pa.float32(),
+    '90thPercentile(ms)': pa.float32(),
+    'MemoryOverhead(MB)': pa.float32(),
+}
+
+# Metrics averaged over repeated runs of the same implementation and row count;
+# MinLatency and MaxLatency keep their overall minimum and maximum instead
+MEAN_METRICS = [
+    'TotalTime(ms)', 'AvgTimePerOp(ms)', '50thPercentile(ms)',
+    '90thPercentile(ms)', 'MemoryOverhead(MB)'
+]
+# How the running per-batch aggregates are combined with each other
+COMBINE = {**{metric: 'sum' for metric in MEAN_METRICS},
+           'MinLatency(ms)': 'min', 'MaxLatency(ms)': 'max', 'Samples': 'sum'}
+
+def aggregate_batch(batch):
+    groups = batch.groupby(['Implementation', 'RowCount'], observed=True, sort=False)
+    # Sums are accumulated in float64 so many batches do not lose precision
+    part = groups[MEAN_METRICS].sum().astype('float64')
+    part['MinLatency(ms)'] = groups['MinLatency(ms)'].min()
+    part['MaxLatency(ms)'] = groups['MaxLatency(ms)'].max()
+    part['Samples'] = groups.size()
+    return part
+
+def read_scalability_results(file_path, block_size=4 << 20):
+    # Stream the CSV in blocks and fold each batch into one row per (Implementation, RowCount),
+    # so memory stays bounded by the number of groups rather than the size of the file
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(column_types=SCALABILITY_TYPES)
+    )
+    totals = None
+    for batch in reader:
+        part = aggregate_batch(batch.to_pandas())
+        if totals is not None:
+            part = pd.concat([totals, part]).groupby(level=[0, 1], observed=True, sort=False).agg(COMBINE)
+        totals = part
+
+    if totals is None or totals.empty:
+        return pd.DataFrame(columns=list(SCALABILITY_TYPES))
+
+    df = totals.reset_index()
+    df[MEAN_METRICS] = df[MEAN_METRICS].div(df['Samples'], axis=0)
+    # Batches may carry different dictionaries, so rebuild one categorical with sorted categories
+    implementations = df['Implementation'].astype(str)
+    df['Implementation'] = pd.Categorical(implementations, categories=sorted(implementations.unique()))
+    return df
+
+def analyze_scalability(file_path='scalability_test_results.csv', plots=True):
     # Read data
     print("Reading data...")
-    df = pd.read_csv(file_path)
+    df = read_scalability_results(file_path)
 
     # Ensure that data is correctly read
     if df.empty:
         print("No data found in the CSV file.")
         return
 
-    # Convert metrics to numeric, matching the exact column names in the CSV
-    metrics = [
-        'TotalTime(ms)', 'AvgTimePerOp(ms)', 'MinLatency(ms)', 
-        'MaxLatency(ms)', '50thPercentile(ms)', '90thPercentile(ms)', 
-        'MemoryOverhead(MB)'
-    ]
-    for metric in metrics:
-        df[metric] = pd.to_numeric(df[metric], errors='coerce')
-
-    # Plot total time taken for each implementation across row counts
-    plot_total_time(df)
-    # Plot average latency per operation
-    plot_avg_time_per_op(df)
-    # Compare latencies across implementations at 50th and 90th percentiles
-    plot_percentiles(df)
-    # Plot memory usage
-    plot_memory_usage(df)
+    if plots:
+        # Draw all four plots into one 2x2 grid, grouping the rows by implementation only once
+        plt = get_pyplot(**PLOT_RC)
+        fig, axes = plt.subplots(2, 2, figsize=(16, 10))
+        groups = list(df.sort_values('RowCount').groupby('Implementation', observed=True, sort=False))
+
+        # Plot total time taken for each implementation across row counts
+        plot_total_time(axes[0, 0], groups)
+        # Plot average latency per operation
+        plot_avg_time_per_op(axes[0, 1], groups)
+        # Compare latencies across implementations at 50th and 90th percentiles
+        plot_percentiles(axes[1, 0], groups)
+        # Plot memory usage
+        plot_memory_usage(axes[1, 1], groups)
+
+        fig.tight_layout()
+        save_figure(fig, 'scalability_combined.png')
+        # Keep the individual plot files by cropping each axes out of the combined figure
+        save_axes(fig, axes[0, 0], 'scalability_total_time.png')
+        save_axes(fig, axes[0, 1], 'scalability_avg_time_per_op.png')
+        save_axes(fig, axes[1, 0], 'scalability_percentiles.png')
+        save_axes(fig, axes[1, 1], 'scalability_memory_usage.png')
+        plt.close(fig)
+
     # Generate a summary of performance across implementations
     print_summary_statistics(df)
 
     print("\nAnalysis completed successfully!")
     print("\nGenerated files:")
-    print("1. scalability_total_time.png - Total time taken by each implementation across row counts")
-    print("2. scalability_avg_time_per_op.png - Average latency per operation across implementations")
-    print("3. scalability_percentiles.png - 50th and 90th percentile latencies")
-    print("4. scalability_memory_usage.png - Memory usage across implementations")
-    print("5. scalability_summary.txt - Summary of best implementations per row count")
-
-def plot_total_time(df):
+    if plots:
+        print("1. scalability_total_time.png - Total time taken by each implementation across row counts")
+        print("2. scalability_avg_time_per_op.png - Average latency per operation across implementations")
+        print("3. scalability_percentiles.png - 50th and 90th percentile latencies")
+        print("4. scalability_memory_usage.png - Memory usage across implementations")
+        print("5. scalability_summary.txt - Summary of best implementations per row count")
+        print("6. scalability_combined.png - All four plots in a single figure")
+    else:
+        print("1. scalability_summary.txt - Summary of best implementations per row count")
+
+def save_axes(fig, ax, file_name):
+    renderer = fig.canvas.get_renderer()
+    bbox = ax.get_tightbbox(renderer).transformed(fig.dpi_scale_trans.inverted())
+    save_figure(fig, file_name, bbox_inches=bbox.padded(0.1))
+
+def plot_total_time(ax, groups):
     print("Creating total time plot for scalability...")
-    plt.figure(figsize=(12, 6))
-    sns.lineplot(data=df, x='RowCount', y='TotalTime(ms)', hue='Implementation', marker='o')
-    plt.title('Total Time Taken for Different Implementations')
-    plt.xlabel('Rows Tested')
-    plt.ylabel('Total Time (ms)')
-    plt.legend(title='Implementation')
-    plt.tight_layout()
-    plt.savefig('scalability_total_time.png')
-    plt.close()
-
-def plot_avg_time_per_op(df):
+    for impl, sub in groups:
+        ax.plot(sub['RowCount'], sub['TotalTime(ms)'], marker='o', label=impl)
+    ax.set_title('Total Time Taken for Different Implementations')
+    ax.set_xlabel('Rows Tested')
+    ax.set_ylabel('Total Time (ms)')
+    ax.legend(title='Implementation')
+
+def plot_avg_time_per_op(ax, groups):
     print("Creating average time per operation plot...")
-    plt.figure(figsize=(12, 6))
-    sns.lineplot(data=df, x='RowCount', y='AvgTimePerOp(ms)', hue='Implementation', marker='o')
-    plt.title('Average Time per Operation by Implementation')
-    plt.xlabel('Rows Tested')
-    plt.ylabel('Avg Time per Operation (ms)')
-    plt.legend(title='Implementation')
-    plt.tight_layout()
-    plt.savefig('scalability_avg_time_per_op.png')
-    plt.close()
-
-def plot_percentiles(df):
+    for impl, sub in groups:
+        ax.plot(sub['RowCount'], sub['AvgTimePerOp(ms)'], marker='o', label=impl)
+    ax.set_title('Average Time per Operation by Implementation')
+    ax.set_xlabel('Rows Tested')
+    ax.set_ylabel('Avg Time per Operation (ms)')
+    ax.legend(title='Implementation')
+
+def plot_percentiles(ax, groups):
     print("Creating percentile comparison plot...")
-    plt.figure(figsize=(12, 6))
-
-    # Plot 50th percentile
-    sns.lineplot(data=df, x='RowCount', y='50thPercentile(ms)', hue='Implementation', marker='o', linestyle='-')
-    
-    # Plot 90th percentile
-    sns.lineplot(data=df, x='RowCount', y='90thPercentile(ms)', hue='Implementation', marker='o', linestyle='--')
-
-    plt.title('Latency Percentiles (50th and 90th) by Implementation')
-    plt.xlabel('Rows Tested')
-    plt.ylabel('Latency (ms)')
-    plt.legend(title='Implementation')
-    plt.tight_layout()
-    plt.savefig('scalability_percentiles.png')
-    plt.close()
-
-def plot_memory_usage(df):
+    for impl, sub in groups:
+        # Plot 50th percentile
+        line, = ax.plot(sub['RowCount'], sub['50thPercentile(ms)'], marker='o', linestyle='-',
+                        label=f'{impl} (50th)')
+        # Plot 90th percentile in the same colour
+        ax.plot(sub['RowCount'], sub['90thPercentile(ms)'], marker='o', linestyle='--',
+                color=line.get_color(), label=f'{impl} (90th)')
+
+    ax.set_title('Latency Percentiles (50th and 90th) by Implementation')
+    ax.set_xlabel('Rows Tested')
+    ax.set_ylabel('Latency (ms)')
+    ax.legend(title='Implementation')
+
+def plot_memory_usage(ax, groups):
     print("Creating memory usage plot...")
-    plt.figure(figsize=(12, 6))
-    sns.lineplot(data=df, x='RowCount', y='MemoryOverhead(MB)', hue='Implementation', marker='o')
-    plt.title('Memory Overhead by Implementation')
-    plt.xlabel('Rows Tested')
-    plt.ylabel('Memory Overhead (MB)')
-    plt.legend(title='Implementation')
-    plt.tight_layout()
-    plt.savefig('scalability_memory_usage.png')
-    plt.close()
+    for impl, sub in groups:
+        ax.plot(sub['RowCount'], sub['MemoryOverhead(MB)'], marker='o', label=impl)
+    ax.set_title('Memory Overhead by Implementation')
+    ax.set_xlabel('Rows Tested')
+    ax.set_ylabel('Memory Overhead (MB)')
+    ax.legend(title='Implementation')
 
 def print_summary_statistics(df):
     print("\nSUMMARY STATISTICS")
@@ -107,42 +168,43 @@ def print_summary_statistics(df):
     print("\nBest Implementation per Row Count (Avg Time per Operation):")
     print("-" * 40)
 
-    row_counts = sorted(df['RowCount'].unique())
-    summary_lines = []
-
+    # Winning row for every row count in one grouped argmin
+    best = df.loc[df.groupby('RowCount', sort=True)['AvgTimePerOp(ms)'].idxmin(),
+                  ['RowCount', 'Implementation', 'AvgTimePerOp(ms)']]
+    best_lines = [f"Rows: {row_count} - Best Implementation: {impl} ({avg_time:.3f} ms)\n"
+                  for row_count, impl, avg_time in best.itertuples(index=False, name=None)]
+
+    # Memory usage summary
+    if 'MemoryOverhead(MB)' in df.columns:
+        memory_summary = df.groupby('Implementation', observed=True)['MemoryOverhead(MB)'].mean()
+        memory_lines = [f"{impl}: Average Memory Overhead: {avg_mem:.2f} MB\n"
+                        for impl, avg_mem in memory_summary.items()]
+    else:
+        memory_lines = ["Memory usage data is not available in the dataset.\n"]
+
+    # Print and write the summary in one go each
+    print(''.join(best_lines + memory_lines), end='')
+    out = [
+        "Scalability Test Summary\n",
+        "=" * 50 + "\n\n",
+        "Best Implementation per Row Count (Avg Time per Operation):\n",
+        "-" * 40 + "\n",
+        *best_lines,
+        "\n\nMemory Usage Summary:\n",
+        "-" * 40 + "\n",
+        *memory_lines,
+    ]
     with open('scalability_summary.txt', 'w') as f:
-        f.write("Scalability Test Summary\n")
-        f.write("=" * 50 + "\n\n")
-        f.write("Best Implementation per Row Count (Avg Time per Operation):\n")
-        f.write("-" * 40 + "\n")
-        for row_count in row_counts:
-            subset = df[df['RowCount'] == row_count]
-            best_impl = subset.loc[subset['AvgTimePerOp(ms)'].idxmin()]
-            summary_line = f"Rows: {row_count} - Best Implementation: {best_impl['Implementation']} ({best_impl['AvgTimePerOp(ms)']:.3f} ms)\n"
-            print(summary_line.strip())
-            f.write(summary_line)
-            summary_lines.append(summary_line)
-
-        # Memory usage summary
-        f.write("\n\nMemory Usage Summary:\n")
-        f.write("-" * 40 + "\n")
-
-        if 'MemoryOverhead(MB)' in df.columns:
-            memory_summary = df.groupby('Implementation')['MemoryOverhead(MB)'].mean()
-            for impl, avg_mem in memory_summary.items():
-                mem_line = f"{impl}: Average Memory Overhead: {avg_mem:.2f} MB\n"
-                print(mem_line.strip())
-                f.write(mem_line)
-                summary_lines.append(mem_line)
-        else:
-            no_memory_data = "Memory usage data is not available in the dataset.\n"
-            print(no_memory_data.strip())
-            f.write(no_memory_data)
-            summary_lines.append(no_memory_data)
+        f.write(''.join(out))
 
 def main():
+    parser = argparse.ArgumentParser(description='Analyze scalability_test_results.csv')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='only write the text summary, without importing matplotlib')
+    args = parser.parse_args()
+
     try:
-        analyze_scalability()
+        analyze_scalability(plots=not args.no_plots)
     except Exception as e:
         print(f"Error during analysis: {str(e)}")
         import traceback
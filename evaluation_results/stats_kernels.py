@@ -0,0 +1,78 @@
+import functools
+import numpy as np
+import pandas as pd
+
+# numba is optional; without it callers fall back to their pandas groupby
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+# Single pass over the values computing count, mean, min, max and the sum of squared
+# deviations (Welford) for every group code at once; negative codes are skipped
+def _fused_stats(codes, values, ngroups):
+    cnt = np.zeros(ngroups, dtype=np.int64)
+    mean = np.zeros(ngroups, dtype=np.float64)
+    m2 = np.zeros(ngroups, dtype=np.float64)
+    mn = np.full(ngroups, np.inf)
+    mx = np.full(ngroups, -np.inf)
+    for i in range(values.shape[0]):
+        c = codes[i]
+        v = values[i]
+        if c < 0 or np.isnan(v):
+            continue
+        cnt[c] += 1
+        delta = v - mean[c]
+        mean[c] += delta / cnt[c]
+        m2[c] += delta * (v - mean[c])
+        if v < mn[c]:
+            mn[c] = v
+        if v > mx[c]:
+            mx[c] = v
+    return cnt, mean, m2, mn, mx
+
+# Compile the kernel once per (values, codes) dtype pair, eagerly against an explicit signature;
+# cache=True also persists the machine code next to this module between runs
+@functools.cache
+def _make_kernel(values_dtype, codes_dtype):
+    # pandas hands out read-only views of its columns, so the inputs are typed as read-only arrays
+    values_type = numba.types.Array(numba.from_dtype(values_dtype), 1, 'A', readonly=True)
+    codes_type = numba.types.Array(numba.from_dtype(codes_dtype), 1, 'A', readonly=True)
+    result_type = numba.types.Tuple((numba.int64[:],) + (numba.float64[:],) * 4)
+    return numba.njit(result_type(codes_type, values_type, numba.int64), cache=True)(_fused_stats)
+
+def fused_stats(codes, values, ngroups):
+    return _make_kernel(values.dtype, codes.dtype)(codes, values, ngroups)
+
+# Mean, min, max and sample std of value_col per combination of the categorical keys, like
+# df.groupby(keys, observed=True)[value_col].agg(['mean', 'min', 'max', 'std'])
+def grouped_stats(df, keys, value_col):
+    # mean and std are returned in float64; min and max are input values, so they keep the input dtype
+    values = df[value_col]
+    output_types = {'mean': 'float64', 'min': values.dtype, 'max': values.dtype, 'std': 'float64'}
+    if not NUMBA_AVAILABLE:
+        # Accumulate in float64 like the kernel, so both paths round the same way
+        return values.astype('float64').groupby([df[key] for key in keys], observed=True, sort=True).agg(
+            ['mean', 'min', 'max', 'std']).astype(output_types)
+
+    # All keys are categorical, so a group code is just a combination of their integer codes
+    codes = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    categories = []
+    for key in keys:
+        column = df[key].cat
+        codes = codes * len(column.categories) + column.codes.to_numpy()
+        missing |= column.codes.to_numpy() < 0
+        categories.append(column.categories)
+    codes[missing] = -1
+    cnt, mean, m2, mn, mx = fused_stats(codes, values.to_numpy(), int(np.prod([len(c) for c in categories])))
+
+    # Like observed=True, only keep groups that actually occur
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(m2 / (cnt - 1))
+    index = pd.MultiIndex.from_product(categories, names=keys)
+    return pd.DataFrame(
+        {'mean': mean, 'min': mn, 'max': mx, 'std': std}, index=index
+    )[cnt > 0].astype(output_types)
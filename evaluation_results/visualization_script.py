@@ -1,51 +1,253 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+from plot_utils import get_pyplot, render_figure, save_image
+from stats_kernels import NUMBA_AVAILABLE, fused_stats, grouped_stats
+
+# pyarrow is optional; without it the CSV is parsed by pandas
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+# Bump whenever _read_csv changes the parsed column types, so stale Parquet caches are not reused
+SUMMARY_CACHE_VERSION = 1
+
+# Operation groups used when comparing implementations
+BASIC_OPS = ['SELECT', 'INSERT', 'UPDATE', 'DELETE']
+COMPLEX_OPS = ['COMPLEX_SELECT', 'COMPLEX_UPDATE', 'COMPLEX_DELETE']
+WRITE_OPS = ['INSERT', 'UPDATE']
+READ_OPS = ['SELECT', 'COMPLEX_SELECT']
+CONDITION_OPS = ['BOOLEAN_CONDITION', 'GREATER_THAN_CONDITION', 'DATE_CONDITION', 'UNKNOWN_CONDITION']
+
+# Characteristics averaged over one operation group each, with the flag column marking the group
+CHARACTERISTIC_FLAGS = {
+    'Avg Basic Op Time': '_is_basic',
+    'Avg Complex Op Time': '_is_complex',
+    'Write Performance': '_is_write',
+    'Read Performance': '_is_read',
+}
+
+# Per-implementation block of implementation_analysis.txt
+ANALYSIS_TEMPLATE = (
+    "\n{impl} Implementation:\n"
+    + "-" * 40 + "\n"
+    + "Basic Operations Avg: {basic:.3f} ms\n"
+    + "Complex Operations Avg: {complex:.3f} ms\n"
+    + "Write Performance: {write:.3f} ms\n"
+    + "Read Performance: {read:.3f} ms\n"
+    + "Operation Consistency: {consistency:.3f} (lower is better)\n"
+)
+
+# Implementation-specific insights appended to the analysis
+KEY_CHARACTERISTICS = {
+    'backwards': [
+        "Stack-based implementation with batch processing",
+        "Sequential access pattern",
+        "Efficient for recent data access",
+    ],
+    'leaky': [
+        "Two-tier storage with controlled data movement",
+        "Automatic memory management",
+        "Efficient for hot data access",
+    ],
+    'ping': [
+        "Dual-list system with frequency-based promotion",
+        "Adaptive to access patterns",
+        "Good for mixed workloads",
+    ],
+    'random': [
+        "Multiple queue distribution",
+        "Hash-based allocation",
+        "Good for parallel access patterns",
+    ],
+}
+
+def _heatmap(ax, data, fmt='.3f', cmap='YlOrRd'):
+    # Annotated heatmap drawn straight from the pivot table values
+    values = data.to_numpy(dtype=float)
+    im = ax.imshow(values, cmap=cmap, aspect='auto')
+    ax.figure.colorbar(im, ax=ax)
+    ax.set_xticks(np.arange(values.shape[1]), labels=data.columns, rotation=45, ha='right')
+    ax.set_yticks(np.arange(values.shape[0]), labels=data.index)
+    ax.set_xlabel(data.columns.name or '')
+    ax.set_ylabel(data.index.name or '')
+    ax.grid(False)
+
+    # Dark text on light cells and light text on dark cells; empty cells stay blank
+    luminance = im.cmap(im.norm(values))[..., :3] @ [0.2126, 0.7152, 0.0722]
+    for i, j in zip(*np.nonzero(~np.isnan(values))):
+        ax.text(j, i, format(values[i, j], fmt), ha='center', va='center',
+                color='black' if luminance[i, j] > 0.408 else 'white')
+    return im
+
+def _add_operation_flags(df):
+    # Boolean columns marking each operation group, computed once from the few Metric categories
+    # and mapped to rows through the category codes; as columns they stay aligned with the rows
+    # through any later filtering or sorting
+    codes = df['Metric'].cat.codes.to_numpy()
+    categories = df['Metric'].cat.categories
+    return df.assign(
+        _is_basic=np.isin(codes, np.flatnonzero(categories.isin(BASIC_OPS))),
+        _is_complex=np.isin(codes, np.flatnonzero(categories.isin(COMPLEX_OPS))),
+        _is_write=np.isin(codes, np.flatnonzero(categories.isin(WRITE_OPS))),
+        _is_read=np.isin(codes, np.flatnonzero(categories.isin(READ_OPS))),
+    )
+
+def _reset_figure(fig, width, height):
+    # Clear the shared figure and resize it for the next plot
+    fig.clear()
+    fig.set_size_inches(width, height)
 
-# Set style for all plots
-plt.style.use('seaborn-v0_8')
-plt.rcParams['figure.figsize'] = [12, 6]
-plt.rcParams['figure.dpi'] = 100
+def _metric_grid(df):
+    # Sum and count of Average_Time_ms per (Implementation, DataType) and Metric, built with a
+    # single pivot; every heatmap of mean operation times is derived from this grid.
+    # The sums are accumulated in float64, like the other reductions over the float32 column
+    return df.assign(Average_Time_ms=df['Average_Time_ms'].astype('float64')).pivot_table(
+        values='Average_Time_ms',
+        index=['Implementation', 'DataType'],
+        columns='Metric',
+        aggfunc=['sum', 'count'],
+        observed=True
+    )
 
-def analyze_csv(file_path='summary_statistics.csv'):
+def _grid_mean(grid, level, metrics=None):
+    # Exact means per index level, combined from the grid's sums and counts
+    sums = grid['sum'].groupby(level=level, observed=True).sum(min_count=1)
+    counts = grid['count'].groupby(level=level, observed=True).sum()
+    means = sums / counts
+    if metrics is not None:
+        means = means.loc[:, means.columns.isin(metrics)]
+    # Like a pivot of the filtered rows, leave out rows without any of the selected metrics
+    return means.dropna(how='all')
+
+def _read_csv(file_path):
+    if pa is None:
+        # Rows of the trailing sections are padded with NaN and dropped by the Category split
+        return pd.read_csv(file_path, dtype={
+            'Category': 'category',
+            'Metric': 'category',
+            'Best_Implementation': 'category',
+            'Average_Time_ms': 'float32'
+        })
+
+    # The SUMMARY and MEMORY USAGE SUMMARY sections appended after the main table
+    # have fewer columns; they are not used here, so the parser skips them
+    df = pacsv.read_csv(
+        file_path,
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+        convert_options=pacsv.ConvertOptions(column_types={
+            'Category': pa.dictionary(pa.int32(), pa.string()),
+            'Metric': pa.dictionary(pa.int32(), pa.string()),
+            'Best_Implementation': pa.dictionary(pa.int32(), pa.string()),
+            'Average_Time_ms': pa.float32()
+        })
+    ).to_pandas()
+    # Arrow lists dictionary values in order of appearance; sort them so grouped output stays alphabetical
+    df['Metric'] = df['Metric'].cat.reorder_categories(sorted(df['Metric'].cat.categories))
+    return df
+
+def _load_summary(file_path):
+    # The parsed table is cached next to the CSV as Parquet and reused while it is newer than the CSV;
+    # the cache name carries SUMMARY_CACHE_VERSION so a file written with older column types is ignored
+    cache_path = f'{os.path.splitext(file_path)[0]}.v{SUMMARY_CACHE_VERSION}.parquet'
+    if pa is not None and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except (OSError, pa.ArrowException) as e:
+            print(f"Ignoring unreadable cache {cache_path}: {e}")
+
+    df = _read_csv(file_path)
+    if pa is not None:
+        # The cache is only an optimisation, so a failed write must not lose the parsed data
+        try:
+            df.to_parquet(cache_path, compression='zstd')
+        except (OSError, pa.ArrowException) as e:
+            print(f"Could not write cache {cache_path}: {e}")
+    return df
+
+def _split_categories(column, sep):
+    # Split each distinct value of a categorical column once, rather than every row, and map the
+    # two parts back onto the rows through the category codes. Values without the separator
+    # get a missing second part
+    codes = column.cat.codes.to_numpy()
+    parts = [name.split(sep, 1) + [None] for name in column.cat.categories]
+    split = []
+    for k in range(2):
+        part_codes, uniques = pd.factorize(pd.Series([p[k] for p in parts], dtype=object), sort=True)
+        # Missing Best_Implementation values keep code -1, i.e. NaN
+        row_codes = np.where(codes < 0, -1, part_codes[codes]) if len(part_codes) else codes
+        split.append(pd.Categorical.from_codes(row_codes, categories=uniques))
+    return split
+
+def analyze_csv(file_path='summary_statistics.csv', plots=True):
     # Read data
     print("Reading data...")
-    df = pd.read_csv(file_path)
+    df = _load_summary(file_path)
 
-    # Extract implementation and operation performance data
-    operations_data = df[df['Category'] == 'Operation'].copy()
-    memory_data = df[df['Category'] == 'Memory'].copy()
+    # Split Best_Implementation into Implementation and DataType once for the whole file
+    df['Implementation'], df['DataType'] = _split_categories(df['Best_Implementation'], '__')
 
-    # Split Best_Implementation into Implementation and DataType
-    operations_data[['Implementation', 'DataType']] = operations_data['Best_Implementation'].str.split('__', expand=True)
-    memory_data[['Implementation', 'DataType']] = memory_data['Best_Implementation'].str.split('__', expand=True)
+    # Extract implementation and operation performance data
+    parts = dict(tuple(df.groupby('Category', observed=True, sort=False)))
+    operations_data = parts.get('Operation', df.iloc[:0])
+    memory_data = parts.get('Memory', df.iloc[:0])
 
     # Drop any rows with NaN values
     operations_data = operations_data.dropna(subset=['Implementation', 'DataType', 'Metric', 'Average_Time_ms'])
     memory_data = memory_data.dropna(subset=['Implementation', 'DataType', 'Average_Time_ms'])
 
-    # Create visualizations and summaries
-    create_operation_performance_plot(operations_data)          # Generates operation_performance.png
-    create_memory_usage_plot(memory_data)                       # Generates memory_usage.png
-    create_data_type_comparison(operations_data)                # Generates data_type_performance.png
-    print_summary_statistics(operations_data, memory_data)       # Generates performance_summary.txt
-    analyze_operation_patterns(operations_data)                  # Generates implementation_patterns.png
-    analyze_implementation_characteristics(operations_data)     # Generates implementation_characteristics.png
-    print_implementation_analysis(operations_data)               # Generates implementation_analysis.txt
-    plot_latency_distribution(operations_data)                   # Generates latency_distribution.png
-    analyze_conditional_queries(operations_data)                 # Generates conditional_query_performance.png
-
-    # Check if 'Data_Size' column exists before plotting trend
-    if 'Data_Size' in operations_data.columns:
-        plot_trend_over_data_sizes(operations_data)              # Generates performance_trend_over_data_sizes.png
-    else:
-        print("Data_Size column missing. Skipping performance_trend_over_data_sizes.png generation.")
+    # Operation group flags shared by every helper that splits basic/complex/write/read operations
+    operations_data = _add_operation_flags(operations_data)
+    # Wide Implementation/DataType x Metric grid shared by the operation heatmaps
+    grid = _metric_grid(operations_data)
+
+    # One figure is reused for every plot, cleared and resized in between. Each plot is rasterised
+    # as soon as it is drawn, and only the image encoding is left to the thread pool
+    plt = get_pyplot() if plots else None
+    fig = plt.figure(figsize=(15, 8)) if plots else None
+    saves = []
+    with ThreadPoolExecutor(max_workers=4) as encoder:
+        def plot(draw, data):
+            if plots:
+                file_name = draw(fig, data)
+                saves.append(encoder.submit(save_image, render_figure(fig), file_name))
+
+        # Create visualizations and summaries
+        plot(create_operation_performance_plot, grid)                 # Generates operation_performance.png
+        plot(create_memory_usage_plot, memory_data)                   # Generates memory_usage.png
+        plot(create_data_type_comparison, grid)                       # Generates data_type_performance.png
+        print_summary_statistics(operations_data, memory_data)        # Generates performance_summary.txt
+        plot(analyze_operation_patterns, grid)                        # Generates implementation_patterns.png
+        characteristics = _impl_stats(operations_data)
+        plot(analyze_implementation_characteristics, characteristics) # Generates implementation_characteristics.png
+        print_implementation_analysis(characteristics)                # Generates implementation_analysis.txt
+        plot(plot_latency_distribution, operations_data)              # Generates latency_distribution.png
+        plot(analyze_conditional_queries, grid)                       # Generates conditional_query_performance.png
+
+        # Check if 'Data_Size' column exists before plotting trend
+        if 'Data_Size' in operations_data.columns:
+            plot(plot_trend_over_data_sizes, operations_data)         # Generates performance_trend_over_data_sizes.png
+        elif plots:
+            print("Data_Size column missing. Skipping performance_trend_over_data_sizes.png generation.")
+    if plots:
+        plt.close(fig)
+    # Surface any error raised while encoding an image
+    for future in saves:
+        future.result()
 
     generate_statistical_summary(operations_data)                # Generates statistical_summary.csv
 
     print("\nAnalysis completed successfully!")
     print("\nGenerated files:")
+    if not plots:
+        print("1. performance_summary.txt - Summary statistics of performance and memory usage")
+        print("2. implementation_analysis.txt - Detailed implementation analysis")
+        print("3. statistical_summary.csv - Comprehensive statistical summary")
+        return
     print("1. operation_performance.png - Operation performance heatmap")
     print("2. memory_usage.png - Memory usage patterns")
     print("3. data_type_performance.png - Performance across different data types")
@@ -58,308 +260,240 @@ def analyze_csv(file_path='summary_statistics.csv'):
     print("10. performance_trend_over_data_sizes.png - Operation performance trends over data sizes")
     print("11. statistical_summary.csv - Comprehensive statistical summary")
 
-def create_operation_performance_plot(df):
+def create_operation_performance_plot(fig, grid):
     print("Creating operation performance plot...")
     # Average performance by implementation and operation type
-    performance_data = df.pivot_table(
-        values='Average_Time_ms',
-        index='Implementation',
-        columns='Metric',
-        aggfunc='mean'
-    ).fillna(0)
-
-    plt.figure(figsize=(15, 8))
-    sns.heatmap(performance_data,
-                annot=True,
-                fmt='.3f',
-                cmap='YlOrRd')
-    plt.title('Operation Performance by Implementation (Lower is Better)')
-    plt.ylabel('Implementation')
-    plt.xlabel('Operation')
-    plt.tight_layout()
-    plt.savefig('operation_performance.png')
-    plt.close()
-
-def create_memory_usage_plot(df):
+    performance_data = _grid_mean(grid, 'Implementation').fillna(0)
+
+    _reset_figure(fig, 15, 8)
+    ax = fig.add_subplot()
+    _heatmap(ax, performance_data)
+    ax.set_title('Operation Performance by Implementation (Lower is Better)')
+    ax.set_ylabel('Implementation')
+    ax.set_xlabel('Operation')
+    fig.tight_layout()
+    return 'operation_performance.png'
+
+def create_memory_usage_plot(fig, df):
     print("Creating memory usage plot...")
     # Average memory usage by implementation and data type
-    plt.figure(figsize=(15, 8))
-    ax = sns.barplot(data=df,
-                     x='DataType',
-                     y='Average_Time_ms',  # This represents MB in memory data
-                     hue='Implementation')
-    plt.title('Memory Usage by Implementation and Data Type')
-    plt.xlabel('Data Type')
-    plt.ylabel('Memory Usage (MB)')
-    plt.xticks(rotation=45)
-    plt.legend(title='Implementation', bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.tight_layout()
-    plt.savefig('memory_usage.png')
-    plt.close()
-
-def create_data_type_comparison(df):
-    print("Creating data type comparison plot...")
-    # Average performance by data type for each operation
-    data_type_perf = df.pivot_table(
+    _reset_figure(fig, 15, 8)
+    ax = fig.add_subplot()
+    # Mean per data type and implementation; Average_Time_ms represents MB in memory data
+    memory = df.pivot_table(
         values='Average_Time_ms',
         index='DataType',
-        columns='Metric',
-        aggfunc='mean'
-    ).fillna(0)
-
-    plt.figure(figsize=(15, 8))
-    sns.heatmap(data_type_perf,
-                annot=True,
-                fmt='.3f',
-                cmap='YlOrRd')
-    plt.title('Operation Performance by Data Type (Lower is Better)')
-    plt.ylabel('Data Type')
-    plt.xlabel('Operation')
-    plt.tight_layout()
-    plt.savefig('data_type_performance.png')
-    plt.close()
+        columns='Implementation',
+        aggfunc='mean',
+        observed=True
+    )
+    x = np.arange(len(memory.index))
+    width = 0.8 / len(memory.columns)
+    for k, impl in enumerate(memory.columns):
+        ax.bar(x + (k - (len(memory.columns) - 1) / 2) * width, memory[impl], width, label=impl)
+    ax.set_xticks(x, memory.index, rotation=45)
+    ax.set_title('Memory Usage by Implementation and Data Type')
+    ax.set_xlabel('Data Type')
+    ax.set_ylabel('Memory Usage (MB)')
+    ax.legend(title='Implementation', bbox_to_anchor=(1.05, 1), loc='upper left')
+    fig.tight_layout()
+    return 'memory_usage.png'
+
+def create_data_type_comparison(fig, grid):
+    print("Creating data type comparison plot...")
+    # Average performance by data type for each operation
+    data_type_perf = _grid_mean(grid, 'DataType').fillna(0)
+
+    _reset_figure(fig, 15, 8)
+    ax = fig.add_subplot()
+    _heatmap(ax, data_type_perf)
+    ax.set_title('Operation Performance by Data Type (Lower is Better)')
+    ax.set_ylabel('Data Type')
+    ax.set_xlabel('Operation')
+    fig.tight_layout()
+    return 'data_type_performance.png'
 
 def print_summary_statistics(op_data, mem_data):
     print("\nSUMMARY STATISTICS")
     print("=" * 50)
 
-    # Best performing implementation for each operation
-    print("\nBest Implementation per Operation:")
-    print("-" * 40)
-
-    for metric in sorted(op_data['Metric'].unique()):
-        subset = op_data[op_data['Metric'] == metric]
-        if not subset.empty:
-            min_idx = subset['Average_Time_ms'].idxmin()
-            if pd.notna(min_idx):
-                best_row = subset.loc[min_idx]
-                print(f"{metric:22}: {best_row['Implementation']} ({best_row['Average_Time_ms']:.3f} ms)")
-
-    # Memory usage summary
-    print("\nMemory Usage Summary:")
-    print("-" * 40)
+    # Best performing implementation for each operation, found in one grouped pass;
+    # Metric categories are sorted alphabetically
+    best_idx = op_data.groupby('Metric', observed=True, sort=True)['Average_Time_ms'].idxmin()
+    best_rows = op_data.loc[best_idx, ['Metric', 'Implementation', 'Average_Time_ms']]
+    best_lines = [f"{metric:22}: {impl} ({time_ms:.3f} ms)\n"
+                  for metric, impl, time_ms in best_rows.itertuples(index=False, name=None)]
 
     # Calculate mean memory usage for each implementation
-    mem_summary = mem_data.groupby('Implementation')['Average_Time_ms'].mean().round(2)
+    mem_summary = mem_data.groupby('Implementation', observed=True, sort=True)['Average_Time_ms'].mean().round(2)
+    memory_lines = [f"{impl:22}: {avg_mem:.2f} MB\n" for impl, avg_mem in mem_summary.dropna().items()]
 
-    for impl in sorted(mem_summary.index):
-        if pd.notna(mem_summary[impl]):
-            print(f"{impl:22}: {mem_summary[impl]:.2f} MB")
+    sections = ("Best Implementation per Operation:\n" + "-" * 40 + "\n" + ''.join(best_lines)
+                + "\nMemory Usage Summary:\n" + "-" * 40 + "\n" + ''.join(memory_lines))
 
-    # Create summary text file
+    # Print and write the summary in one go each
+    print("\n" + sections, end='')
     with open('performance_summary.txt', 'w') as f:
-        f.write("Performance Summary\n")
-        f.write("=" * 50 + "\n\n")
-
-        f.write("Best Implementation per Operation:\n")
-        f.write("-" * 40 + "\n")
-        for metric in sorted(op_data['Metric'].unique()):
-            subset = op_data[op_data['Metric'] == metric]
-            if not subset.empty:
-                min_idx = subset['Average_Time_ms'].idxmin()
-                if pd.notna(min_idx):
-                    best_row = subset.loc[min_idx]
-                    f.write(f"{metric:22}: {best_row['Implementation']} ({best_row['Average_Time_ms']:.3f} ms)\n")
-
-        f.write("\nMemory Usage Summary:\n")
-        f.write("-" * 40 + "\n")
-        for impl in sorted(mem_summary.index):
-            if pd.notna(mem_summary[impl]):
-                f.write(f"{impl:22}: {mem_summary[impl]:.2f} MB\n")
-
-def analyze_operation_patterns(df):
-    print("Analyzing operation patterns...")
+        f.write("Performance Summary\n" + "=" * 50 + "\n\n" + sections)
 
-    # Group operations by type
-    basic_ops = ['SELECT', 'INSERT', 'UPDATE', 'DELETE']
-    complex_ops = ['COMPLEX_SELECT', 'COMPLEX_UPDATE', 'COMPLEX_DELETE']
+def analyze_operation_patterns(fig, grid):
+    print("Analyzing operation patterns...")
 
     # Calculate average performance for basic vs complex operations
-    plt.figure(figsize=(15, 6))
+    _reset_figure(fig, 15, 6)
 
     # Basic operations subplot
-    plt.subplot(1, 2, 1)
-    basic_data = df[df['Metric'].isin(basic_ops)].pivot_table(
-        values='Average_Time_ms',
-        index='Implementation',
-        columns='Metric',
-        aggfunc='mean'
-    ).fillna(0)
+    ax = fig.add_subplot(1, 2, 1)
+    basic_data = _grid_mean(grid, 'Implementation', BASIC_OPS).fillna(0)
 
-    sns.heatmap(basic_data,
-                annot=True,
-                fmt='.3f',
-                cmap='YlOrRd')
-    plt.title('Basic Operation Performance\n(Lower is Better)')
+    _heatmap(ax, basic_data)
+    ax.set_title('Basic Operation Performance\n(Lower is Better)')
 
     # Complex operations subplot
-    plt.subplot(1, 2, 2)
-    complex_data = df[df['Metric'].isin(complex_ops)].pivot_table(
-        values='Average_Time_ms',
-        index='Implementation',
-        columns='Metric',
-        aggfunc='mean'
-    ).fillna(0)
-
-    sns.heatmap(complex_data,
-                annot=True,
-                fmt='.3f',
-                cmap='YlOrRd')
-    plt.title('Complex Operation Performance\n(Lower is Better)')
-
-    plt.tight_layout()
-    plt.savefig('implementation_patterns.png')
-    plt.close()
-
-def analyze_implementation_characteristics(df):
+    ax = fig.add_subplot(1, 2, 2)
+    complex_data = _grid_mean(grid, 'Implementation', COMPLEX_OPS).fillna(0)
+
+    _heatmap(ax, complex_data)
+    ax.set_title('Complex Operation Performance\n(Lower is Better)')
+
+    fig.tight_layout()
+    return 'implementation_patterns.png'
+
+def _impl_stats(df):
+    # Per-implementation characteristics shared by the heatmap and the text analysis.
+    # The operation groups overlap (SELECT is both basic and read), so rather than bucketing each
+    # row once, every characteristic is aggregated over its own flagged rows
+    if NUMBA_AVAILABLE:
+        return _impl_stats_numba(df)
+
+    # Each characteristic gets its own column holding the times outside its group as NaN
+    values = df['Average_Time_ms'].astype('float64')
+    masked = pd.DataFrame({name: values.where(df[flag]) for name, flag in CHARACTERISTIC_FLAGS.items()})
+    masked['Operation Consistency'] = values
+
+    # Calculate metrics that highlight implementation differences in a single grouped pass;
+    # consistency is the sample standard deviation of all operation times
+    characteristics = masked.groupby(df['Implementation'], observed=True).agg(
+        {**dict.fromkeys(CHARACTERISTIC_FLAGS, 'mean'), 'Operation Consistency': 'std'})
+    return characteristics.rename_axis(None)
+
+def _impl_stats_numba(df):
+    # Same characteristics from the fused kernel: rows outside a group get code -1 and are skipped
+    implementations = df['Implementation'].cat
+    codes = implementations.codes.to_numpy()
+    values = df['Average_Time_ms'].to_numpy()
+    ngroups = len(implementations.categories)
+
+    columns = {}
+    for name, flag in CHARACTERISTIC_FLAGS.items():
+        cnt, mean, _, _, _ = fused_stats(np.where(df[flag].to_numpy(), codes, -1), values, ngroups)
+        columns[name] = np.where(cnt > 0, mean, np.nan)
+
+    # Sample standard deviation of all operation times per implementation
+    cnt, _, m2, _, _ = fused_stats(codes, values, ngroups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        columns['Operation Consistency'] = np.sqrt(m2 / (cnt - 1))
+
+    # Like observed=True, only keep implementations that actually occur
+    return pd.DataFrame(columns, index=implementations.categories)[cnt > 0]
+
+def analyze_implementation_characteristics(fig, characteristics):
     print("Analyzing implementation characteristics...")
 
-    # Calculate metrics that highlight implementation differences
-    characteristics = pd.DataFrame()
-
-    for impl in df['Implementation'].unique():
-        impl_data = df[df['Implementation'] == impl]
-
-        # Calculate various characteristics
-        characteristics.loc[impl, 'Avg Basic Op Time'] = impl_data[
-            impl_data['Metric'].isin(['SELECT', 'INSERT', 'UPDATE', 'DELETE'])
-        ]['Average_Time_ms'].mean()
-
-        characteristics.loc[impl, 'Avg Complex Op Time'] = impl_data[
-            impl_data['Metric'].str.startswith('COMPLEX_')
-        ]['Average_Time_ms'].mean()
-
-        characteristics.loc[impl, 'Write Performance'] = impl_data[
-            impl_data['Metric'].isin(['INSERT', 'UPDATE'])
-        ]['Average_Time_ms'].mean()
-
-        characteristics.loc[impl, 'Read Performance'] = impl_data[
-            impl_data['Metric'].isin(['SELECT', 'COMPLEX_SELECT'])
-        ]['Average_Time_ms'].mean()
-
-        characteristics.loc[impl, 'Operation Consistency'] = impl_data['Average_Time_ms'].std()
-
     # Create visualization of implementation characteristics
-    plt.figure(figsize=(15, 8))
-    sns.heatmap(characteristics,
-                annot=True,
-                fmt='.3f',
-                cmap='YlOrRd')
-    plt.title('Implementation Characteristics\n(Lower is Better)')
-    plt.tight_layout()
-    plt.savefig('implementation_characteristics.png')
-    plt.close()
-
-def print_implementation_analysis(df):
+    _reset_figure(fig, 15, 8)
+    ax = fig.add_subplot()
+    _heatmap(ax, characteristics)
+    ax.set_title('Implementation Characteristics\n(Lower is Better)')
+    fig.tight_layout()
+    return 'implementation_characteristics.png'
+
+def print_implementation_analysis(characteristics):
     print("\nIMPLEMENTATION ANALYSIS")
     print("=" * 50)
 
-    implementations = sorted(df['Implementation'].unique())
+    # One block per implementation; columns follow the order produced by _impl_stats
+    analyses = []
+    for impl, basic, complex_, write, read, consistency in characteristics.itertuples(name=None):
+        analysis = ANALYSIS_TEMPLATE.format(impl=impl, basic=basic, complex=complex_, write=write,
+                                            read=read, consistency=consistency)
+
+        # Add implementation-specific insights
+        if impl in KEY_CHARACTERISTICS:
+            analysis += "\nKey Characteristics:\n"
+            analysis += ''.join(f"- {line}\n" for line in KEY_CHARACTERISTICS[impl])
 
+        analyses.append(analysis + "\n")
+
+    # Print and write the whole analysis in one go each
+    print(''.join(analyses), end='')
     with open('implementation_analysis.txt', 'w') as f:
-        f.write("Implementation Analysis\n")
-        f.write("=" * 50 + "\n\n")
-
-        for impl in implementations:
-            impl_data = df[df['Implementation'] == impl]
-
-            # Calculate key metrics
-            basic_perf = impl_data[
-                impl_data['Metric'].isin(['SELECT', 'INSERT', 'UPDATE', 'DELETE'])
-            ]['Average_Time_ms'].mean()
-
-            complex_perf = impl_data[
-                impl_data['Metric'].str.startswith('COMPLEX_')
-            ]['Average_Time_ms'].mean()
-
-            write_perf = impl_data[
-                impl_data['Metric'].isin(['INSERT', 'UPDATE'])
-            ]['Average_Time_ms'].mean()
-
-            read_perf = impl_data[
-                impl_data['Metric'].isin(['SELECT', 'COMPLEX_SELECT'])
-            ]['Average_Time_ms'].mean()
-
-            consistency = impl_data['Average_Time_ms'].std()
-
-            # Write analysis
-            analysis = f"\n{impl} Implementation:\n"
-            analysis += "-" * 40 + "\n"
-            analysis += f"Basic Operations Avg: {basic_perf:.3f} ms\n"
-            analysis += f"Complex Operations Avg: {complex_perf:.3f} ms\n"
-            analysis += f"Write Performance: {write_perf:.3f} ms\n"
-            analysis += f"Read Performance: {read_perf:.3f} ms\n"
-            analysis += f"Operation Consistency: {consistency:.3f} (lower is better)\n"
-
-            # Add implementation-specific insights
-            if impl == 'backwards':
-                analysis += "\nKey Characteristics:\n"
-                analysis += "- Stack-based implementation with batch processing\n"
-                analysis += "- Sequential access pattern\n"
-                analysis += "- Efficient for recent data access\n"
-            elif impl == 'leaky':
-                analysis += "\nKey Characteristics:\n"
-                analysis += "- Two-tier storage with controlled data movement\n"
-                analysis += "- Automatic memory management\n"
-                analysis += "- Efficient for hot data access\n"
-            elif impl == 'ping':
-                analysis += "\nKey Characteristics:\n"
-                analysis += "- Dual-list system with frequency-based promotion\n"
-                analysis += "- Adaptive to access patterns\n"
-                analysis += "- Good for mixed workloads\n"
-            elif impl == 'random':
-                analysis += "\nKey Characteristics:\n"
-                analysis += "- Multiple queue distribution\n"
-                analysis += "- Hash-based allocation\n"
-                analysis += "- Good for parallel access patterns\n"
-
-            print(analysis)
-            f.write(analysis + "\n")
-
-def plot_latency_distribution(df):
-    plt.figure(figsize=(15, 8))
-    sns.boxplot(data=df, x='Metric', y='Average_Time_ms', hue='Implementation')
-    plt.title('Latency Distribution by Operation and Implementation')
-    plt.xlabel('Operation')
-    plt.ylabel('Latency (ms)')
-    plt.legend(title='Implementation')
-    plt.tight_layout()
-    plt.savefig('latency_distribution.png')
-    plt.close()
-
-def analyze_conditional_queries(df):
-    conditions = ['BOOLEAN_CONDITION', 'GREATER_THAN_CONDITION', 'DATE_CONDITION', 'UNKNOWN_CONDITION']
-    cond_df = df[df['Metric'].isin(conditions)]
-    cond_heatmap = cond_df.pivot_table(
-        values='Average_Time_ms',
-        index='Implementation',
-        columns='Metric',
-        aggfunc='mean'
-    )
-    plt.figure(figsize=(10, 6))
-    sns.heatmap(cond_heatmap, annot=True, cmap='YlOrRd', fmt='.3f')
-    plt.title('Performance of Conditional Queries by Implementation')
-    plt.xlabel('Condition Type')
-    plt.ylabel('Implementation')
-    plt.tight_layout()
-    plt.savefig('conditional_query_performance.png')
-    plt.close()
-
-def plot_trend_over_data_sizes(df):
-    plt.figure(figsize=(15, 8))
-    sns.lineplot(data=df, x='Data_Size', y='Average_Time_ms', hue='Implementation', style='Metric')
-    plt.title('Trend of Operation Performance Over Data Sizes')
-    plt.xlabel('Data Size')
-    plt.ylabel('Average Latency (ms)')
-    plt.legend(title='Implementation & Metric')
-    plt.tight_layout()
-    plt.savefig('performance_trend_over_data_sizes.png')
-    plt.close()
+        f.write("Implementation Analysis\n" + "=" * 50 + "\n\n" + ''.join(analyses))
+
+def plot_latency_distribution(fig, df):
+    _reset_figure(fig, 15, 8)
+    ax = fig.add_subplot()
+    metrics = df['Metric'].unique()
+    implementations = df['Implementation'].unique()
+    samples = {key: group.to_numpy() for key, group in
+               df.groupby(['Metric', 'Implementation'], observed=True, sort=False)['Average_Time_ms']}
+
+    # One box per implementation, side by side within each operation
+    x = np.arange(len(metrics))
+    width = 0.8 / len(implementations)
+    # The legend is built from the first box of each implementation, since boxplot only
+    # accepts a label from matplotlib 3.9
+    handles = []
+    for k, impl in enumerate(implementations):
+        boxes = ax.boxplot([samples.get((metric, impl), []) for metric in metrics],
+                           positions=x + (k - (len(implementations) - 1) / 2) * width,
+                           widths=width * 0.9, patch_artist=True, manage_ticks=False,
+                           medianprops={'color': 'black'})
+        for box in boxes['boxes']:
+            box.set_facecolor(f'C{k}')
+        handles.append(boxes['boxes'][0])
+    ax.set_xticks(x, metrics, rotation=45, ha='right')
+    ax.set_title('Latency Distribution by Operation and Implementation')
+    ax.set_xlabel('Operation')
+    ax.set_ylabel('Latency (ms)')
+    ax.legend(handles, implementations, title='Implementation')
+    fig.tight_layout()
+    return 'latency_distribution.png'
+
+def analyze_conditional_queries(fig, grid):
+    cond_heatmap = _grid_mean(grid, 'Implementation', CONDITION_OPS)
+    _reset_figure(fig, 10, 6)
+    ax = fig.add_subplot()
+    _heatmap(ax, cond_heatmap)
+    ax.set_title('Performance of Conditional Queries by Implementation')
+    ax.set_xlabel('Condition Type')
+    ax.set_ylabel('Implementation')
+    fig.tight_layout()
+    return 'conditional_query_performance.png'
+
+def plot_trend_over_data_sizes(fig, df):
+    _reset_figure(fig, 15, 8)
+    ax = fig.add_subplot()
+    trend = df.groupby(['Implementation', 'Metric', 'Data_Size'], observed=True, sort=False)['Average_Time_ms'].mean()
+
+    # Colour encodes the implementation and line style/marker encode the operation
+    colors = {impl: f'C{k}' for k, impl in enumerate(trend.index.unique('Implementation'))}
+    styles = {metric: (['-', '--', '-.', ':'][k % 4], 'osD^v<>px*h'[k % 11])
+              for k, metric in enumerate(trend.index.unique('Metric'))}
+    for (impl, metric), sub in trend.groupby(level=['Implementation', 'Metric'], observed=True, sort=False):
+        sub = sub.droplevel(['Implementation', 'Metric']).sort_index()
+        linestyle, marker = styles[metric]
+        ax.plot(sub.index, sub.to_numpy(), color=colors[impl], linestyle=linestyle, marker=marker,
+                label=f'{impl} / {metric}')
+    ax.set_title('Trend of Operation Performance Over Data Sizes')
+    ax.set_xlabel('Data Size')
+    ax.set_ylabel('Average Latency (ms)')
+    ax.legend(title='Implementation & Metric')
+    fig.tight_layout()
+    return 'performance_trend_over_data_sizes.png'
 
 def generate_statistical_summary(df):
-    summary = df.groupby(['Implementation', 'Metric']).agg({
-        'Average_Time_ms': ['mean', 'min', 'max', 'std']
-    }).round(3)
+    summary = grouped_stats(df, ['Implementation', 'Metric'], 'Average_Time_ms').round(3)
     summary.columns = ['Mean', 'Min', 'Max', 'Std']
     summary.to_csv('statistical_summary.csv')
     print("Statistical summary saved to 'statistical_summary.csv'")
@@ -367,8 +501,12 @@ def generate_statistical_summary(df):
     # Removed the undefined 'heatmap_data' loop
 
 def main():
+    parser = argparse.ArgumentParser(description='Analyse summary_statistics.csv')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='only write the text and CSV summaries, without importing matplotlib')
+    args = parser.parse_args()
     try:
-        analyze_csv()
+        analyze_csv(plots=not args.no_plots)
         # The analyze_csv function already prints the "Analysis completed successfully" and "Generated files" messages
     except Exception as e:
         print(f"Error during analysis: {str(e)}")